@@ -3,11 +3,43 @@ Prompt Analytics and Comparison Module
 Analyze prompt performance and compare model responses
 """
 
-import json
+import heapq
+import io
+from array import array
 from pathlib import Path
-from typing import Dict, List, Optional
-from collections import defaultdict
-import statistics
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+import json_io
+from prompt_model import intern_prompt_fields
+
+
+def _load_one(json_file: str) -> Optional[Dict]:
+    """Parse a single prompt file, returning None if it can't be read"""
+    try:
+        return intern_prompt_fields(json_io.load_file(json_file))
+    except (OSError, ValueError):
+        return None
+
+
+# Marks a missing score in int8 score columns, whose stored values are 0-127
+_MISSING_INT8 = -1
+
+
+def _compact_scores(column: List) -> Sequence:
+    """Pack a score column into an int8 array when every value fits"""
+    if all(v is None or (type(v) is int and 0 <= v < 128) for v in column):
+        return array('b', [_MISSING_INT8 if v is None else v for v in column])
+    return column
+
+
+def _group_mean(total, count):
+    """Mean from a running total, kept as an int when ints divide evenly"""
+    if total % count == 0:
+        return total // count
+    return total / count
 
 
 class PromptAnalytics:
@@ -15,44 +47,146 @@ class PromptAnalytics:
     
     def __init__(self, prompts_dir: str = "prompts"):
         self.prompts_dir = Path(prompts_dir)
-        self.prompts = self._load_all_prompts()
+        self._files = list(json_io.iter_json_files(self.prompts_dir))
+    
+    @cached_property
+    def prompts(self) -> List[Dict]:
+        """
+        All prompts as dicts, materialized on first access
+        
+        The analytics below don't need this list; they stream the files once
+        and keep only the fields they read.
+        """
+        return self._load_all_prompts()
+    
+    def _iter_prompts(self) -> Iterator[Dict]:
+        """Yield prompts one at a time, streaming from disk unless already loaded"""
+        if 'prompts' in self.__dict__:
+            yield from self.prompts
+            return
+        for entry in self._files:
+            data = _load_one(entry.path)
+            if data is not None:
+                yield data
     
     def _load_all_prompts(self) -> List[Dict]:
         """Load all valid prompts from directory"""
-        prompts = []
-        for json_file in self.prompts_dir.rglob("*.json"):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    prompts.append(json.load(f))
-            except Exception:
-                pass
-        return prompts
+        if not self._files:
+            return []
+        # File reads and orjson parsing release the GIL, so threads overlap the I/O
+        with ThreadPoolExecutor(max_workers=min(32, len(self._files))) as ex:
+            loaded = ex.map(_load_one, [entry.path for entry in self._files])
+            return [data for data in loaded if data is not None]
     
-    def get_category_stats(self) -> Dict:
-        """Get statistics by category"""
-        stats = defaultdict(lambda: {
+    @cached_property
+    def _scan(self) -> Tuple[Dict, Dict]:
+        """
+        Single streaming pass building both _aggregate and _columns
+        
+        Each file is parsed once per instance and dropped after its fields are
+        recorded, so every result comes from the same read of the directory.
+        """
+        categories = defaultdict(lambda: {
             'count': 0,
-            'avg_scores': defaultdict(list),
+            'score_totals': defaultdict(lambda: [0, 0]),
             'models_used': set()
         })
+        prompts_by_model = defaultdict(list)
+        categories_by_model = defaultdict(set)
+        
+        ids = []
+        titles = []
+        category_column = []
+        models_column = []
+        scores = {}
         
-        for prompt in self.prompts:
-            cat = prompt.get('category', 'unknown')
-            stats[cat]['count'] += 1
+        total = 0
+        for i, prompt in enumerate(self._iter_prompts()):
+            total += 1
+            category = prompt.get('category')
+            stats = categories[category if category is not None else 'unknown']
+            stats['count'] += 1
             
             if 'score' in prompt:
+                # Running (total, count) per metric instead of collecting every value
+                totals = stats['score_totals']
                 for metric, value in prompt['score'].items():
-                    stats[cat]['avg_scores'][metric].append(value)
+                    acc = totals[metric]
+                    acc[0] += value
+                    acc[1] += 1
             
-            if 'models_tested' in prompt:
-                stats[cat]['models_used'].update(prompt['models_tested'])
+            models = prompt.get('models_tested', [])
+            stats['models_used'].update(models)
+            for model in models:
+                prompts_by_model[model].append(prompt.get('id'))
+                categories_by_model[model].add(category)
+            
+            ids.append(prompt.get('id'))
+            titles.append(prompt.get('title'))
+            category_column.append(category)
+            models_column.append(frozenset(models).union(prompt.get('responses', {})))
+            for metric, value in prompt.get('score', {}).items():
+                if metric not in scores:
+                    scores[metric] = [None] * i
+                scores[metric].append(value)
+            for column in scores.values():
+                if len(column) == i:
+                    column.append(None)
+        
+        aggregate = {
+            'total': total,
+            'categories': categories,
+            'prompts_by_model': prompts_by_model,
+            'categories_by_model': categories_by_model
+        }
+        columns = {
+            'ids': ids,
+            'titles': titles,
+            'categories': category_column,
+            'models': models_column,
+            'scores': {metric: _compact_scores(column) for metric, column in scores.items()}
+        }
+        return aggregate, columns
+    
+    @property
+    def _aggregate(self) -> Dict:
+        """Category and model aggregates: total, categories, prompts/categories by model"""
+        return self._scan[0]
+    
+    @property
+    def _columns(self) -> Dict:
+        """
+        Column-wise view of the fields the per-prompt analytics read.
         
+        Each list is parallel to load order; scores hold one column per
+        metric with None where a prompt has no value for it. Integer score
+        columns are packed into int8 arrays using _MISSING_INT8 instead.
+        """
+        return self._scan[1]
+    
+    @cached_property
+    def _model_presence(self) -> Dict[str, Set[int]]:
+        """Map each model to the indexes of prompts it was tested or answered on"""
+        presence = defaultdict(set)
+        for i, models in enumerate(self._columns['models']):
+            for model in models:
+                presence[model].add(i)
+        return dict(presence)
+    
+    @cached_property
+    def _category_keys(self) -> List[str]:
+        """Each prompt's category with 'unknown' for missing ones, in load order"""
+        return [category if category is not None else 'unknown'
+                for category in self._columns['categories']]
+    
+    def get_category_stats(self) -> Dict:
+        """Get statistics by category"""
         # Calculate averages
         result = {}
-        for cat, data in stats.items():
+        for cat, data in self._aggregate['categories'].items():
             avg_scores = {
-                metric: round(statistics.mean(values), 2) if values else 0
-                for metric, values in data['avg_scores'].items()
+                metric: round(_group_mean(total, count), 2)
+                for metric, (total, count) in data['score_totals'].items()
             }
             result[cat] = {
                 'count': data['count'],
@@ -64,123 +198,125 @@ class PromptAnalytics:
     
     def compare_models(self, model1: str, model2: str) -> Dict:
         """Compare two models' performance"""
+        model1_idx = self._model_presence.get(model1, set())
+        model2_idx = self._model_presence.get(model2, set())
+        
+        categories = self._category_keys
+        model1_counts = Counter(categories[i] for i in model1_idx)
+        model2_counts = Counter(categories[i] for i in model2_idx)
+        # Categories in order of first appearance, as the per-prompt loop produced them
+        ordered = dict.fromkeys(categories[i] for i in sorted(model1_idx | model2_idx))
+        
         comparison = {
             'model1': model1,
             'model2': model2,
             'prompts_tested': {
-                'model1': 0,
-                'model2': 0,
-                'both': 0
+                'model1': len(model1_idx),
+                'model2': len(model2_idx),
+                'both': len(model1_idx & model2_idx)
             },
-            'categories': defaultdict(lambda: {'model1': 0, 'model2': 0})
+            'categories': {
+                category: {
+                    'model1': model1_counts[category],
+                    'model2': model2_counts[category]
+                }
+                for category in ordered
+            }
         }
         
-        for prompt in self.prompts:
-            models = prompt.get('models_tested', [])
-            responses = prompt.get('responses', {})
-            category = prompt.get('category', 'unknown')
-            
-            has_model1 = model1 in models or model1 in responses
-            has_model2 = model2 in models or model2 in responses
-            
-            if has_model1:
-                comparison['prompts_tested']['model1'] += 1
-                comparison['categories'][category]['model1'] += 1
-            if has_model2:
-                comparison['prompts_tested']['model2'] += 1
-                comparison['categories'][category]['model2'] += 1
-            if has_model1 and has_model2:
-                comparison['prompts_tested']['both'] += 1
-        
         return comparison
     
     def get_top_prompts(self, metric: str = 'effectiveness', limit: int = 10) -> List[Dict]:
         """Get top-rated prompts by metric"""
-        scored_prompts = []
+        column = self._columns['scores'].get(metric)
+        if column is None:
+            return []
         
-        for prompt in self.prompts:
-            if 'score' in prompt and metric in prompt['score']:
-                scored_prompts.append({
-                    'id': prompt.get('id'),
-                    'title': prompt.get('title'),
-                    'category': prompt.get('category'),
-                    'score': prompt['score'][metric]
-                })
+        missing = _MISSING_INT8 if isinstance(column, array) else None
         
-        scored_prompts.sort(key=lambda x: x['score'], reverse=True)
-        return scored_prompts[:limit]
+        # Partial selection over indexes keeps only `limit` candidates instead of sorting
+        top = heapq.nlargest(
+            limit,
+            (i for i, value in enumerate(column) if value != missing),
+            key=column.__getitem__
+        )
+        ids = self._columns['ids']
+        titles = self._columns['titles']
+        categories = self._columns['categories']
+        return [
+            {
+                'id': ids[i],
+                'title': titles[i],
+                'category': categories[i],
+                'score': column[i]
+            }
+            for i in top
+        ]
     
     def get_coverage_report(self) -> Dict:
         """Generate test coverage report"""
-        all_models = set()
-        prompts_by_model = defaultdict(list)
-        categories_by_model = defaultdict(set)
-        
-        for prompt in self.prompts:
-            models = prompt.get('models_tested', [])
-            all_models.update(models)
-            
-            for model in models:
-                prompts_by_model[model].append(prompt.get('id'))
-                categories_by_model[model].add(prompt.get('category'))
+        total = self._aggregate['total']
+        prompts_by_model = self._aggregate['prompts_by_model']
+        categories_by_model = self._aggregate['categories_by_model']
         
         coverage = {}
-        for model in all_models:
+        for model, prompt_ids in prompts_by_model.items():
             coverage[model] = {
-                'total_prompts': len(prompts_by_model[model]),
+                'total_prompts': len(prompt_ids),
                 'categories_covered': len(categories_by_model[model]),
                 'coverage_percentage': round(
-                    len(prompts_by_model[model]) / len(self.prompts) * 100, 1
-                ) if self.prompts else 0
+                    len(prompt_ids) / total * 100, 1
+                ) if total else 0
             }
         
         return {
-            'total_models': len(all_models),
+            'total_models': len(prompts_by_model),
             'models': coverage,
-            'total_prompts': len(self.prompts)
+            'total_prompts': total
         }
     
     def generate_report(self, output_file: Optional[str] = None) -> str:
         """Generate comprehensive analytics report"""
-        report = []
-        report.append("=" * 60)
-        report.append("AI PROMPT LAB - ANALYTICS REPORT")
-        report.append("=" * 60)
-        report.append("")
+        buf = io.StringIO()
+        w = buf.write
+        w("=" * 60 + "\n")
+        w("AI PROMPT LAB - ANALYTICS REPORT\n")
+        w("=" * 60 + "\n")
+        w("\n")
         
         # Overall stats
-        report.append(f"Total Prompts: {len(self.prompts)}")
-        report.append("")
+        w(f"Total Prompts: {self._aggregate['total']}\n")
+        w("\n")
         
         # Category stats
-        report.append("CATEGORY BREAKDOWN")
-        report.append("-" * 60)
+        w("CATEGORY BREAKDOWN\n")
+        w("-" * 60 + "\n")
         cat_stats = self.get_category_stats()
         for cat, data in sorted(cat_stats.items()):
-            report.append(f"\n{cat.upper()}")
-            report.append(f"  Prompts: {data['count']}")
+            w(f"\n{cat.upper()}\n")
+            w(f"  Prompts: {data['count']}\n")
             if data['avg_scores']:
-                report.append(f"  Average Scores:")
+                w("  Average Scores:\n")
                 for metric, score in data['avg_scores'].items():
-                    report.append(f"    {metric}: {score}")
-            report.append(f"  Models: {', '.join(data['models_used'])}")
+                    w(f"    {metric}: {score}\n")
+            w(f"  Models: {', '.join(data['models_used'])}\n")
         
-        report.append("")
+        w("\n")
         
         # Coverage report
-        report.append("MODEL COVERAGE")
-        report.append("-" * 60)
+        w("MODEL COVERAGE\n")
+        w("-" * 60 + "\n")
         coverage = self.get_coverage_report()
         for model, data in sorted(coverage['models'].items()):
-            report.append(f"\n{model}")
-            report.append(f"  Prompts tested: {data['total_prompts']}")
-            report.append(f"  Categories covered: {data['categories_covered']}")
-            report.append(f"  Coverage: {data['coverage_percentage']}%")
+            w(f"\n{model}\n")
+            w(f"  Prompts tested: {data['total_prompts']}\n")
+            w(f"  Categories covered: {data['categories_covered']}\n")
+            w(f"  Coverage: {data['coverage_percentage']}%\n")
         
-        report.append("")
-        report.append("=" * 60)
+        w("\n")
+        w("=" * 60)
         
-        report_text = "\n".join(report)
+        report_text = buf.getvalue()
         
         if output_file:
             with open(output_file, 'w') as f:
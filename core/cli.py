@@ -5,10 +5,15 @@ Command-line interface for managing prompts
 """
 
 import argparse
-import json
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, List, Optional
+
+import json_io
+from prompt_model import intern_prompt_fields
 from prompt_validator import PromptValidator
 
 
@@ -16,6 +21,18 @@ class PromptCLI:
     def __init__(self):
         self.validator = PromptValidator()
         self.base_path = Path(__file__).parent.parent
+    
+    def _read_prompt(self, filepath: Path) -> Dict:
+        """Parse a prompt file"""
+        return intern_prompt_fields(json_io.load_file(filepath))
+    
+    def _try_read_prompt(self, filepath: Path) -> Optional[Dict]:
+        """Parse a prompt file, returning None if it can't be read or isn't a JSON object"""
+        try:
+            data = self._read_prompt(filepath)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
         
     def create_prompt(self, args):
         """Interactive prompt creation wizard"""
@@ -70,8 +87,7 @@ class PromptCLI:
         filename = f"{prompt_id.replace('-', '_')}_{title.lower().replace(' ', '_')[:30]}.json"
         filepath = category_path / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(prompt_data, f, indent=2, ensure_ascii=False)
+        filepath.write_bytes(json_io.dumps_indented(prompt_data))
         
         print(f"\n✅ Prompt created: {filepath}")
         print(f"\n💡 Next steps:")
@@ -82,8 +98,12 @@ class PromptCLI:
     def validate(self, args):
         """Validate prompts"""
         target = args.path if args.path else self.base_path / "prompts"
+        cache_path = getattr(args, 'cache', None)
         
         if Path(target).is_file():
+            if cache_path:
+                print("❌ --cache only applies when validating a directory")
+                sys.exit(2)
             is_valid, error, warnings = self.validator.validate_prompt_file(target)
             if is_valid:
                 print(f"✅ {target} passed validation.")
@@ -96,7 +116,7 @@ class PromptCLI:
                 print(f"   {error}")
                 sys.exit(1)
         else:
-            results = self.validator.validate_directory(target)
+            results = self.validator.validate_directory(target, cache_path=cache_path)
             passed = sum(1 for r in results.values() if r[0])
             failed = len(results) - passed
             
@@ -124,14 +144,17 @@ class PromptCLI:
                 return
             files = list(category_path.glob("*.json"))
         else:
-            files = list(prompts_dir.rglob("*.json"))
+            files = [Path(entry.path) for entry in json_io.iter_json_files(prompts_dir)]
         
         print(f"\n📚 Found {len(files)} prompts:\n")
         
-        for filepath in sorted(files):
+        files.sort()
+        with ThreadPoolExecutor(max_workers=min(32, len(files) or 1)) as ex:
+            futures = [ex.submit(self._read_prompt, filepath) for filepath in files]
+        
+        for filepath, future in zip(files, futures):
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = future.result()
                 category = data.get('category', 'unknown')
                 title = data.get('title', 'Untitled')
                 prompt_id = data.get('id', '?')
@@ -142,35 +165,32 @@ class PromptCLI:
     def stats(self, args):
         """Show repository statistics"""
         prompts_dir = self.base_path / "prompts"
-        results = self.validator.validate_directory(str(prompts_dir))
         
-        categories = {}
-        total_models = set()
-        total_tags = set()
+        if args.no_validate:
+            scanned = [self._try_read_prompt(Path(entry.path))
+                       for entry in json_io.iter_json_files(prompts_dir)]
+        else:
+            # Each file is parsed once and that parse feeds both validation and the counts
+            scanned = [
+                intern_prompt_fields(data) if is_valid else None
+                for _, data, is_valid, _, _ in self.validator.iter_validated(str(prompts_dir))
+            ]
         
-        for filepath, (is_valid, _, _) in results.items():
-            if not is_valid:
-                continue
-                
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                cat = data.get('category', 'unknown')
-                categories[cat] = categories.get(cat, 0) + 1
-                
-                if 'models_tested' in data:
-                    total_models.update(data['models_tested'])
-                
-                if 'tags' in data:
-                    total_tags.update(data['tags'])
-                    
-            except Exception:
-                pass
+        total = len(scanned)
+        datas = [data for data in scanned if data is not None]
+        valid = len(datas)
+        
+        # --no-validate skips the schema, so check types before counting
+        categories = Counter(_category(data) for data in datas)
+        total_models = set().union(*(_list_field(data, 'models_tested') for data in datas))
+        total_tags = set().union(*(_list_field(data, 'tags') for data in datas))
         
         print("\n📊 AI Prompt Lab Statistics\n")
-        print(f"Total Prompts: {len(results)}")
-        print(f"Valid Prompts: {sum(1 for r in results.values() if r[0])}")
+        print(f"Total Prompts: {total}")
+        if args.no_validate:
+            print(f"Readable Prompts: {valid}")
+        else:
+            print(f"Valid Prompts: {valid}")
         print(f"\nBy Category:")
         for cat, count in sorted(categories.items()):
             print(f"  {cat:15} {count:3}")
@@ -180,6 +200,20 @@ class PromptCLI:
         print(f"\nUnique Tags: {len(total_tags)}")
 
 
+def _category(data: Dict) -> str:
+    """A prompt's category, or 'unknown' when it is missing or not a string"""
+    category = data.get('category')
+    return category if isinstance(category, str) else 'unknown'
+
+
+def _list_field(data: Dict, field: str) -> List[str]:
+    """The string items of a prompt's list field; empty when it is missing or not a list"""
+    value = data.get(field)
+    if not isinstance(value, list):
+        return []
+    return [item for item in value if isinstance(item, str)]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="AI Prompt Lab CLI",
@@ -194,6 +228,9 @@ def main():
     # Validate command
     validate_parser = subparsers.add_parser('validate', help='Validate prompts')
     validate_parser.add_argument('path', nargs='?', help='File or directory to validate')
+    validate_parser.add_argument('--cache', metavar='FILE',
+                                 help='When validating a directory, reuse results for unchanged '
+                                      'files from this cache file')
     
     # List command
     list_parser = subparsers.add_parser('list', help='List all prompts')
@@ -201,6 +238,8 @@ def main():
     
     # Stats command
     stats_parser = subparsers.add_parser('stats', help='Show repository statistics')
+    stats_parser.add_argument('--no-validate', action='store_true',
+                              help='Skip schema validation and count every readable prompt')
     
     args = parser.parse_args()
     
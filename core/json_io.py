@@ -0,0 +1,58 @@
+"""
+JSON I/O Module
+orjson-backed helpers and JSON file discovery shared by the validator,
+analytics and CLI
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Iterator, Union
+
+import orjson
+
+# Subclass of json.JSONDecodeError, so existing handlers keep working
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str"""
+    return orjson.loads(data)
+
+
+def load_file(file_path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file in one buffered read"""
+    return orjson.loads(Path(file_path).read_bytes())
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes"""
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+
+
+def dumps_indented(obj: Any) -> bytes:
+    """Serialize with 2-space indentation and non-ASCII kept as-is"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+
+def iter_json_files(root: Union[str, Path]) -> Iterator[os.DirEntry]:
+    """
+    Recursively yield *.json files under root, in the same order as rglob
+    
+    DirEntry objects carry the file type from the directory listing and
+    cache stat(), so callers avoid the extra syscalls Path.rglob makes.
+    """
+    try:
+        with os.scandir(str(Path(root))) as it:
+            entries = list(it)
+    except OSError:
+        return
+    
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+        elif entry.name.endswith(".json") and entry.is_file():
+            yield entry
+    
+    for subdir in subdirs:
+        yield from iter_json_files(subdir)
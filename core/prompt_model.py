@@ -0,0 +1,26 @@
+"""
+Prompt Model Module
+Helpers for the prompt fields shared by analytics and the CLI
+"""
+
+import sys
+from typing import Any
+
+
+def intern_prompt_fields(prompt: Any) -> Any:
+    """
+    Intern a prompt's category, model and tag strings in place
+    
+    These repeat across the corpus, so interning keeps one copy of each and
+    lets the set/dict work in analytics compare them by identity.
+    """
+    if not isinstance(prompt, dict):
+        return prompt
+    category = prompt.get('category')
+    if isinstance(category, str):
+        prompt['category'] = sys.intern(category)
+    for field in ('models_tested', 'tags'):
+        values = prompt.get(field)
+        if isinstance(values, list):
+            prompt[field] = [sys.intern(v) if isinstance(v, str) else v for v in values]
+    return prompt
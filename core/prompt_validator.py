@@ -3,16 +3,115 @@ Prompt Validator Module
 Validates prompts against the defined schema
 """
 
-import json
+import hashlib
+import os
+import re
 import sys
-from jsonschema import validate, ValidationError, Draft7Validator
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from jsonschema import ValidationError, Draft7Validator
 from pathlib import Path
-from typing import Tuple, Dict, List, Optional
+from typing import Callable, NamedTuple, Tuple, Dict, Iterable, Iterator, List, Optional
+
+import json_io
+
+try:
+    import fastjsonschema
+except ImportError:  # pragma: no cover - jsonschema fallback
+    fastjsonschema = None
+
+# Exceptions raised by whichever validator backend is in use
+if fastjsonschema is not None:
+    _SCHEMA_ERRORS = (ValidationError, fastjsonschema.JsonSchemaException)
+else:  # pragma: no cover
+    _SCHEMA_ERRORS = (ValidationError,)
+
+# Below this many files, process start-up costs more than validating serially
+PARALLEL_MIN_FILES = 32
+
+# Suggested name for an opt-in validate_directory cache file. It deliberately
+# avoids a .json suffix so prompt scans never pick it up.
+CACHE_FILENAME = ".validator_cache"
+
+# Fingerprint of this module's source, part of every cache key, so any change
+# to the validation rules or the cached result layout invalidates old verdicts
+_RULES_FINGERPRINT = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+
+# Warning codes and their message templates
+WARN_SCORE_EMPTY = "SCORE_EMPTY"
+WARN_MODELS_MISMATCH = "MODELS_MISMATCH"
+WARN_VAR_UNUSED = "VAR_UNUSED"
+
+_WARNING_MESSAGES = {
+    WARN_SCORE_EMPTY: "Score object exists but all values are empty",
+    WARN_MODELS_MISMATCH: (
+        "Mismatch between models_tested and response keys: "
+        "tested={tested}, responses={responses}"
+    ),
+    WARN_VAR_UNUSED: "Variable '{name}' not found in prompt text",
+}
+
+
+class PromptWarning(NamedTuple):
+    """A non-fatal validation finding, formatted into a message only when shown"""
+    code: str
+    name: Optional[str] = None
+    models_tested: Tuple[str, ...] = ()
+    response_models: Tuple[str, ...] = ()
+    
+    def __str__(self) -> str:
+        return _WARNING_MESSAGES[self.code].format(
+            name=self.name,
+            tested=set(self.models_tested),
+            responses=set(self.response_models)
+        )
+
+
+class ValidationResult(NamedTuple):
+    """Outcome of validating one prompt; unpacks as (is_valid, error, warnings)"""
+    ok: bool
+    error: Optional[str] = None
+    warnings: Tuple[PromptWarning, ...] = ()
+
+
+# Shared result for prompts that pass with no warnings
+_OK = ValidationResult(True)
+
+# What iter_validated yields: (file_path, prompt_data, is_valid, error_message, warnings)
+ScannedPrompt = Tuple[str, Optional[Dict], bool, Optional[str], Tuple[PromptWarning, ...]]
+
+
+@lru_cache(maxsize=4)
+def _load_schema(schema_path: str) -> Tuple[Dict, str, Callable[[Dict], None]]:
+    """
+    Load, hash and compile a schema once per process
+    
+    Args:
+        schema_path: Resolved path to the JSON schema file
+        
+    Returns:
+        tuple: (schema, schema_hash, validate_function)
+    """
+    schema = json_io.load_file(schema_path)
+    schema_hash = hashlib.blake2b(json_io.dumps(schema, sort_keys=True)).hexdigest()
+    
+    # fastjsonschema generates code specialised to this schema. Format checks
+    # stay off to match jsonschema's defaults.
+    if fastjsonschema is not None:
+        validate = fastjsonschema.compile(schema, use_default=False, use_formats=False)
+    else:  # pragma: no cover
+        validate = Draft7Validator(schema).validate
+    return schema, schema_hash, validate
 
 
 class PromptValidator:
     """Validates prompts against the prompt schema"""
     
+    # Any {placeholder} in prompt text. For non-empty names without braces this finds
+    # exactly what a "{var}" substring check would; other names are checked literally.
+    _VAR_RE = re.compile(r"\{([^{}]+)\}")
+    
     def __init__(self, schema_path=None):
         """
         Initialize the validator with a schema
@@ -22,11 +121,19 @@ class PromptValidator:
         """
         if schema_path is None:
             schema_path = Path(__file__).parent / "prompt_schema.json"
+        self.schema_path = str(schema_path)
+        
+        # Shared with every other validator on the same schema file; treat as read-only
+        self.schema, self._schema_hash, self._fast_validate = _load_schema(
+            str(Path(schema_path).resolve())
+        )
         
-        with open(schema_path, 'r') as f:
-            self.schema = json.load(f)
+        # The most common rejection, checked with one hash lookup before the full schema
+        enum = self.schema.get('properties', {}).get('category', {}).get('enum')
+        self._valid_categories = frozenset(enum) if enum else None
+        self._category_error = f"data.category must be one of {enum}"
     
-    def validate_prompt(self, prompt_data: Dict) -> Tuple[bool, Optional[str], List[str]]:
+    def validate_prompt(self, prompt_data: Dict) -> ValidationResult:
         """
         Validate a prompt against the schema
         
@@ -34,40 +141,64 @@ class PromptValidator:
             prompt_data: Dictionary containing prompt data
             
         Returns:
-            tuple: (is_valid, error_message, warnings)
+            ValidationResult: (ok, error_message, warnings)
         """
+        if self._valid_categories is not None and isinstance(prompt_data, dict):
+            category = prompt_data.get('category')
+            if isinstance(category, str) and category not in self._valid_categories:
+                return ValidationResult(False, self._category_error)
+        
         warnings = []
         
         try:
-            validate(instance=prompt_data, schema=self.schema)
+            self._fast_validate(prompt_data)
             
             # Additional validation checks
             if 'score' in prompt_data:
                 score = prompt_data['score']
                 if not any(score.values()):
-                    warnings.append("Score object exists but all values are empty")
+                    warnings.append(PromptWarning(WARN_SCORE_EMPTY))
                     
             if 'models_tested' in prompt_data and 'responses' in prompt_data:
                 models_in_responses = set(prompt_data['responses'].keys())
                 models_tested = set(prompt_data['models_tested'])
                 if models_in_responses != models_tested:
-                    warnings.append(
-                        f"Mismatch between models_tested and response keys: "
-                        f"tested={models_tested}, responses={models_in_responses}"
-                    )
+                    warnings.append(PromptWarning(
+                        WARN_MODELS_MISMATCH,
+                        models_tested=tuple(sorted(models_tested)),
+                        response_models=tuple(sorted(models_in_responses))
+                    ))
             
             if 'variables' in prompt_data and 'prompt' in prompt_data:
                 prompt_text = prompt_data['prompt']
-                for var in prompt_data['variables']:
-                    if f"{{{var}}}" not in prompt_text:
-                        warnings.append(f"Variable '{var}' not found in prompt text")
+                found = set(self._VAR_RE.findall(prompt_text))
+                # dict.fromkeys drops repeated names while keeping declaration order
+                for var in dict.fromkeys(prompt_data['variables']):
+                    if var in found:
+                        continue
+                    if (not var or '{' in var or '}' in var) and f"{{{var}}}" in prompt_text:
+                        continue
+                    warnings.append(PromptWarning(WARN_VAR_UNUSED, name=var))
             
-            return True, None, warnings
+            return ValidationResult(True, None, tuple(warnings)) if warnings else _OK
             
-        except ValidationError as e:
-            return False, str(e), warnings
+        except _SCHEMA_ERRORS as e:
+            return ValidationResult(False, str(e))
     
-    def validate_prompt_file(self, file_path: str) -> Tuple[bool, Optional[str], List[str]]:
+    def validate_prompts(self, prompts: Iterable[Dict]) -> List[ValidationResult]:
+        """
+        Validate a batch of prompts in one call
+        
+        Args:
+            prompts: Iterable of prompt dictionaries
+            
+        Returns:
+            list: ValidationResult for each prompt, in input order
+        """
+        validate = self.validate_prompt  # bound once for the whole batch
+        return [validate(prompt) for prompt in prompts]
+    
+    def validate_prompt_file(self, file_path: str) -> ValidationResult:
         """
         Validate a prompt file
         
@@ -75,25 +206,71 @@ class PromptValidator:
             file_path: Path to the JSON file containing prompt data
             
         Returns:
-            tuple: (is_valid, error_message, warnings)
+            ValidationResult: (ok, error_message, warnings)
+        """
+        return self._load_and_validate(file_path)[1]
+    
+    def _validate_from_json_bytes(self, data: bytes) -> ValidationResult:
         """
+        Validate a prompt from raw JSON without touching the filesystem
+        
+        Args:
+            data: JSON document as bytes (or str)
+            
+        Returns:
+            ValidationResult: (ok, error_message, warnings)
+        """
+        return self._parse_and_validate(data)[1]
+    
+    def _load_and_validate(self, file_path) -> Tuple[Optional[Dict], ValidationResult]:
+        """Read a prompt file and validate it, returning the parsed data too"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                prompt_data = json.load(f)
-            return self.validate_prompt(prompt_data)
-        except json.JSONDecodeError as e:
-            return False, f"Invalid JSON: {str(e)}", []
+            data = Path(file_path).read_bytes()
         except FileNotFoundError:
-            return False, f"File not found: {file_path}", []
+            return None, ValidationResult(False, f"File not found: {file_path}")
         except Exception as e:
-            return False, f"Unexpected error: {str(e)}", []
+            return None, ValidationResult(False, f"Unexpected error: {str(e)}")
+        return self._parse_and_validate(data)
     
-    def validate_directory(self, directory_path: str) -> Dict[str, Tuple[bool, Optional[str], List[str]]]:
+    def _parse_and_validate(self, data: bytes) -> Tuple[Optional[Dict], ValidationResult]:
+        """Parse raw JSON and validate it, returning the parsed data too"""
+        prompt_data = None
+        try:
+            prompt_data = json_io.loads(data)
+            return prompt_data, self.validate_prompt(prompt_data)
+        except json_io.JSONDecodeError as e:
+            return None, ValidationResult(False, f"Invalid JSON: {str(e)}")
+        except Exception as e:
+            return prompt_data, ValidationResult(False, f"Unexpected error: {str(e)}")
+    
+    def iter_validated(self, directory_path: str) -> Iterator[ScannedPrompt]:
+        """
+        Parse and validate each JSON file in a directory, one at a time
+        
+        Args:
+            directory_path: Path to directory containing prompt files
+            
+        Yields:
+            tuple: (file_path, prompt_data, is_valid, error_message, warnings);
+            prompt_data is None when the file could not be parsed
+        """
+        directory = Path(directory_path)
+        if not directory.exists():
+            return
+        
+        for entry in json_io.iter_json_files(directory):
+            prompt_data, result = self._load_and_validate(entry.path)
+            yield (entry.path, prompt_data) + result
+    
+    def validate_directory(self, directory_path: str,
+                           cache_path: Optional[str] = None) -> Dict[str, ValidationResult]:
         """
         Validate all JSON files in a directory
         
         Args:
             directory_path: Path to directory containing prompt files
+            cache_path: Optional file to reuse results for unchanged files from;
+                nothing is written unless this is given
             
         Returns:
             dict: Mapping of file paths to validation results
@@ -103,11 +280,114 @@ class PromptValidator:
         
         if not directory.exists():
             return results
-            
-        for json_file in directory.rglob("*.json"):
-            results[str(json_file)] = self.validate_prompt_file(str(json_file))
+        
+        root = str(directory.resolve())
+        cache = self._read_cache(Path(cache_path), root) if cache_path else {}
+        updated = {}
+        pending = []
+        
+        for entry in json_io.iter_json_files(directory):
+            path = entry.path
+            # Cache entries are relative so absolute and relative invocations share them
+            name = Path(path).relative_to(directory).as_posix()
+            st = entry.stat()
+            key = f"{st.st_mtime_ns}:{st.st_size}:{self._schema_hash}:{_RULES_FINGERPRINT}"
+            cached = cache.get(name)
+            result = self._result_from_cache(cached, key)
+            if result is not None:
+                results[path] = result
+                updated[name] = cached
+            else:
+                results[path] = None  # keeps scan order; filled in below
+                updated[name] = {'key': key, 'result': None}
+                pending.append((path, name))
+        
+        paths = [path for path, _ in pending]
+        if len(paths) < PARALLEL_MIN_FILES:
+            fresh = [self.validate_prompt_file(path) for path in paths]
+        else:
+            with ProcessPoolExecutor(initializer=_init_worker,
+                                     initargs=(self.schema_path,)) as ex:
+                fresh = list(ex.map(_validate_one, paths, chunksize=16))
+        
+        for (path, name), result in zip(pending, fresh):
+            results[path] = result
+            updated[name]['result'] = self._result_to_cache(result)
+        
+        if cache_path and updated != cache:
+            self._write_cache(Path(cache_path), {'root': root, 'files': updated})
             
         return results
+    
+    @staticmethod
+    def _result_to_cache(result: ValidationResult) -> List:
+        """Flatten a validation result into JSON-friendly lists"""
+        is_valid, error, warnings = result
+        return [is_valid, error, [list(warning) for warning in warnings]]
+    
+    @staticmethod
+    def _result_from_cache(cached, key: str) -> Optional[ValidationResult]:
+        """
+        Rebuild a validation result stored by _result_to_cache
+        
+        Returns None when the entry is stale or malformed, so a corrupt or
+        hand-edited cache only costs a re-validation.
+        """
+        if not isinstance(cached, dict) or cached.get('key') != key:
+            return None
+        try:
+            is_valid, error, warnings = cached['result']
+            return ValidationResult(is_valid, error, tuple(
+                PromptWarning(code, name, tuple(tested), tuple(responses))
+                for code, name, tested, responses in warnings
+            ))
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def _read_cache(cache_path: Path, root: str) -> Dict:
+        """Load cached results for root, or an empty cache if unreadable or for another directory"""
+        try:
+            cache = json_io.load_file(cache_path)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get('root') != root:
+            return {}
+        files = cache.get('files')
+        return files if isinstance(files, dict) else {}
+    
+    @staticmethod
+    def _write_cache(cache_path: Path, cache: Dict) -> None:
+        """Atomically replace the cache file; failures only cost a re-validation"""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name)
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json_io.dumps(cache))
+            # mkstemp creates the file 0600; give it the mode a normal open() would
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+
+
+# Per-process validator used by validate_directory's worker pool
+_worker_validator = None
+
+
+def _init_worker(schema_path: str) -> None:
+    """Build the schema validator once per worker process"""
+    global _worker_validator
+    _worker_validator = PromptValidator(schema_path)
+
+
+def _validate_one(file_path: str) -> ValidationResult:
+    """Validate a single file with the worker's validator"""
+    return _worker_validator.validate_prompt_file(file_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,13 @@
+"""
+Shared pytest fixtures
+"""
+
+import pytest
+
+from prompt_validator import PromptValidator
+
+
+@pytest.fixture(scope="session")
+def validator():
+    """Create a validator instance shared by the whole session (read-only use)"""
+    return PromptValidator()
@@ -0,0 +1,151 @@
+"""
+Unit tests for the PromptAnalytics class
+"""
+
+import json
+
+import pytest
+
+import analytics as analytics_module
+from analytics import PromptAnalytics
+
+
+def _write_prompts(root, prompts):
+    """Write each prompt dict to root/<relative path> and return root as a string"""
+    for relative_path, prompt in prompts.items():
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(prompt))
+    return str(root)
+
+
+@pytest.fixture
+def scored_dir(tmp_path):
+    """Prompts covering a tie, a zero score, a missing metric and no score at all"""
+    # Files in a directory load before its subdirectories, so "top-a" precedes "top-e"
+    return _write_prompts(tmp_path, {
+        "a.json": {"id": "top-a", "title": "A", "category": "coding",
+                   "score": {"effectiveness": 5, "clarity": 2}},
+        "b.json": {"id": "top-b", "title": "B", "category": "coding",
+                   "score": {"effectiveness": 0}},
+        "c.json": {"id": "top-c", "title": "C", "category": "creative",
+                   "score": {"clarity": 4}},
+        "d.json": {"id": "top-d", "title": "D", "category": "creative"},
+        "sub/e.json": {"id": "top-e", "title": "E", "category": "education",
+                       "score": {"effectiveness": 5}},
+    })
+
+
+class TestTopPrompts:
+    """Test get_top_prompts over the packed score columns"""
+    
+    def test_ranks_ties_zero_and_missing(self, scored_dir):
+        """Test ties keep load order, zero counts as a score, missing ones are skipped"""
+        top = PromptAnalytics(scored_dir).get_top_prompts("effectiveness", 10)
+        assert [(p["id"], p["score"]) for p in top] == [
+            ("top-a", 5), ("top-e", 5), ("top-b", 0)
+        ]
+        assert top[0] == {"id": "top-a", "title": "A", "category": "coding", "score": 5}
+    
+    def test_limit_and_unknown_metric(self, scored_dir):
+        """Test the limit cuts the ranking and an unknown metric ranks nothing"""
+        analytics = PromptAnalytics(scored_dir)
+        assert [p["id"] for p in analytics.get_top_prompts("effectiveness", 1)] == ["top-a"]
+        assert [p["id"] for p in analytics.get_top_prompts("clarity", 10)] == ["top-c", "top-a"]
+        assert analytics.get_top_prompts("nope", 10) == []
+    
+    @pytest.mark.parametrize("scores", [
+        [200, 3],        # Beyond int8 range
+        [-1, 3],         # Same value as the missing-score sentinel
+        [1.5, 3],        # Not an integer
+    ])
+    def test_out_of_range_scores_kept_exact(self, tmp_path, scores):
+        """Test scores that don't fit the int8 packing are neither wrapped nor dropped"""
+        directory = _write_prompts(tmp_path, {
+            f"p{i}.json": {"id": f"p{i}", "title": "T", "category": "coding",
+                           "score": {"effectiveness": value}}
+            for i, value in enumerate(scores)
+        })
+        top = PromptAnalytics(directory).get_top_prompts("effectiveness", 10)
+        assert sorted(p["score"] for p in top) == sorted(scores)
+
+
+@pytest.fixture
+def mixed_dir(tmp_path):
+    """Prompts with and without category, score and models_tested"""
+    return _write_prompts(tmp_path, {
+        "p1.json": {"id": "p1", "title": "P1", "category": "coding",
+                    "models_tested": ["gpt-4", "claude-3"],
+                    "responses": {"gpt-4": "r", "claude-3": "r"},
+                    "score": {"clarity": 4, "accuracy": 5}},
+        "p2.json": {"id": "p2", "title": "P2", "category": "coding",
+                    "models_tested": ["gpt-4"],
+                    "responses": {"gpt-4": "r"},
+                    "score": {"clarity": 3}},
+        "p3.json": {"id": "p3", "title": "P3",
+                    "models_tested": ["claude-3"],
+                    "responses": {"claude-3": "r"}},
+        "p4.json": {"id": "p4", "title": "P4", "category": "education",
+                    "responses": {"llama": "r"}},
+    })
+
+
+class TestCategoryStats:
+    """Test get_category_stats aggregation"""
+    
+    def test_counts_means_and_models(self, mixed_dir):
+        """Test per-category counts, score means and models, with 'unknown' for no category"""
+        stats = PromptAnalytics(mixed_dir).get_category_stats()
+        assert set(stats) == {"coding", "unknown", "education"}
+        
+        assert stats["coding"]["count"] == 2
+        assert stats["coding"]["avg_scores"] == {"clarity": 3.5, "accuracy": 5}
+        assert sorted(stats["coding"]["models_used"]) == ["claude-3", "gpt-4"]
+        
+        assert stats["unknown"] == {"count": 1, "avg_scores": {}, "models_used": ["claude-3"]}
+        assert stats["education"] == {"count": 1, "avg_scores": {}, "models_used": []}
+    
+    def test_empty_directory(self, tmp_path):
+        """Test an empty directory has no categories"""
+        assert PromptAnalytics(str(tmp_path)).get_category_stats() == {}
+
+
+class TestCompareModels:
+    """Test compare_models counts"""
+    
+    def test_overlapping_models(self, mixed_dir):
+        """Test prompt and per-category counts for two models sharing a prompt"""
+        comparison = PromptAnalytics(mixed_dir).compare_models("gpt-4", "claude-3")
+        assert comparison["prompts_tested"] == {"model1": 2, "model2": 2, "both": 1}
+        assert comparison["categories"] == {
+            "coding": {"model1": 2, "model2": 1},
+            "unknown": {"model1": 0, "model2": 1},
+        }
+    
+    def test_response_only_and_unknown_models(self, mixed_dir):
+        """Test a model seen only in responses counts, and an unseen model counts nothing"""
+        analytics = PromptAnalytics(mixed_dir)
+        comparison = analytics.compare_models("llama", "nope")
+        assert comparison["prompts_tested"] == {"model1": 1, "model2": 0, "both": 0}
+        assert comparison["categories"] == {"education": {"model1": 1, "model2": 0}}
+        
+        assert analytics.compare_models("nope", "nope")["categories"] == {}
+
+
+def test_single_streaming_pass(mixed_dir, monkeypatch):
+    """Test the analytics parse each file once and never build the prompts list"""
+    loaded = []
+    load_one = analytics_module._load_one
+    
+    def spy(path):
+        loaded.append(path)
+        return load_one(path)
+    
+    monkeypatch.setattr(analytics_module, "_load_one", spy)
+    analytics = PromptAnalytics(mixed_dir)
+    analytics.generate_report()
+    analytics.get_top_prompts("clarity", 3)
+    analytics.compare_models("gpt-4", "claude-3")
+    
+    assert len(loaded) == len(set(loaded)) == 4
+    assert "prompts" not in analytics.__dict__
@@ -0,0 +1,105 @@
+"""
+Unit tests for the PromptCLI commands
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import pytest
+
+from cli import PromptCLI
+
+
+@pytest.fixture
+def prompt_cli(tmp_path):
+    """Return a CLI rooted at a temp repo with one valid and one invalid prompt"""
+    prompts = tmp_path / "prompts" / "coding"
+    prompts.mkdir(parents=True)
+    (prompts / "valid.json").write_text(json.dumps({
+        "id": "code-001",
+        "title": "Valid",
+        "category": "coding",
+        "prompt": "Review this code",
+        "models_tested": ["gpt-4"],
+        "responses": {"gpt-4": "response"}
+    }))
+    (prompts / "invalid.json").write_text(json.dumps({
+        "id": "Not Valid",
+        "title": "Invalid",
+        "category": "coding",
+        "prompt": "Review this code",
+        "models_tested": ["claude-3"],
+        "responses": {"claude-3": "response"}
+    }))
+    
+    cli = PromptCLI()
+    cli.base_path = tmp_path
+    return cli
+
+
+def test_stats_no_validate(prompt_cli, capsys):
+    """Test stats counts schema-invalid prompts only with --no-validate"""
+    prompt_cli.stats(argparse.Namespace(no_validate=False))
+    validated = capsys.readouterr().out
+    prompt_cli.stats(argparse.Namespace(no_validate=True))
+    unvalidated = capsys.readouterr().out
+    
+    assert "Total Prompts: 2" in validated
+    assert "Valid Prompts: 1" in validated
+    assert "Unique Models Tested: 1" in validated
+    
+    assert "Total Prompts: 2" in unvalidated
+    assert "Readable Prompts: 2" in unvalidated
+    assert "Valid Prompts" not in unvalidated
+    assert "Unique Models Tested: 2" in unvalidated
+
+
+def test_stats_no_validate_skips_malformed(prompt_cli, capsys):
+    """Test --no-validate skips non-object files and treats null list fields as empty"""
+    coding = prompt_cli.base_path / "prompts" / "coding"
+    (coding / "array.json").write_text("[1, 2]")
+    (coding / "nulls.json").write_text(json.dumps({
+        "id": "code-002",
+        "category": "coding",
+        "models_tested": None,
+        "tags": None
+    }))
+    
+    prompt_cli.stats(argparse.Namespace(no_validate=True))
+    output = capsys.readouterr().out
+    assert "Total Prompts: 4" in output
+    assert "Readable Prompts: 3" in output
+    assert "Unique Models Tested: 2" in output
+    assert "Unique Tags: 0" in output
+
+
+def test_stats_no_validate_ignores_wrong_types(prompt_cli, capsys):
+    """Test --no-validate counts non-string categories as unknown and skips non-string items"""
+    (prompt_cli.base_path / "prompts" / "coding" / "odd.json").write_text(json.dumps({
+        "id": "code-003",
+        "category": ["coding"],
+        "models_tested": [["gpt-4"], 7, "llama"],
+        "tags": [{"tag": "x"}, "review"]
+    }))
+    
+    prompt_cli.stats(argparse.Namespace(no_validate=True))
+    output = capsys.readouterr().out
+    assert "Readable Prompts: 3" in output
+    assert "unknown" in output
+    assert "Unique Models Tested: 3" in output
+    assert "claude-3, gpt-4, llama" in output
+    assert "Unique Tags: 1" in output
+
+
+def test_validate_cache_option(prompt_cli, capsys):
+    """Test --cache is optional on the namespace and rejected for a single file"""
+    valid = prompt_cli.base_path / "prompts" / "coding" / "valid.json"
+    prompt_cli.validate(argparse.Namespace(path=str(valid)))
+    assert "passed validation" in capsys.readouterr().out
+    
+    with pytest.raises(SystemExit) as exc:
+        prompt_cli.validate(argparse.Namespace(path=str(valid), cache=str(valid) + ".cache"))
+    assert exc.value.code == 2
+    assert "--cache" in capsys.readouterr().out
+    assert not Path(str(valid) + ".cache").exists()
@@ -2,70 +2,92 @@
 Unit tests for the PromptValidator class
 """
 
+import copy
 import json
+import os
+import re
 import pytest
 from pathlib import Path
-import sys
-import os
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "core"))
+import json_io
+import prompt_validator
+from prompt_validator import (
+    PromptValidator, PromptWarning, CACHE_FILENAME, PARALLEL_MIN_FILES,
+    WARN_MODELS_MISMATCH, WARN_VAR_UNUSED
+)
 
-from prompt_validator import PromptValidator
+# Repository paths, resolved once at import
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_CORE = _REPO_ROOT / "core"
 
+# Schema read and parsed once per test process
+_SCHEMA_PATH = _CORE / "prompt_schema.json"
+_SCHEMA_CACHE = json_io.loads(_SCHEMA_PATH.read_bytes()) if _SCHEMA_PATH.exists() else None
 
-@pytest.fixture
-def validator():
-    """Create a validator instance"""
-    return PromptValidator()
+# Mirrors the schema's "id" pattern
+_ID_RE = re.compile(r"^[a-z0-9-]+$")
+_INVALID_IDS = ["TEST_001", "Abc", "x y", ""]
 
 
-@pytest.fixture
-def valid_prompt():
-    """Return a valid prompt for testing"""
-    return {
-        "id": "test-001",
-        "title": "Test Prompt",
-        "category": "education",
-        "prompt": "This is a test prompt",
-        "responses": {
-            "gpt-4": "Test response"
-        }
+# Canonical prompts; fixtures hand out deep copies so tests may mutate them
+_VALID_PROMPT_TEMPLATE = {
+    "id": "test-001",
+    "title": "Test Prompt",
+    "category": "education",
+    "prompt": "This is a test prompt",
+    "responses": {
+        "gpt-4": "Test response"
     }
+}
+
+_VALID_PROMPT_WITH_VARIABLES_TEMPLATE = {
+    "id": "test-002",
+    "title": "Test Prompt with Variables",
+    "category": "coding",
+    "goal": "Test goal",
+    "prompt": "Explain {concept} in {language}",
+    "variables": ["concept", "language"],
+    "tags": ["test", "example"],
+    "models_tested": ["gpt-4"],
+    "responses": {
+        "gpt-4": "Test response"
+    },
+    "score": {
+        "clarity": 5,
+        "accuracy": 4,
+        "creativity": 3
+    },
+    "last_updated": "2025-10-10"
+}
 
 
 @pytest.fixture
-def valid_prompt_with_variables():
-    """Return a valid prompt with variables"""
-    return {
-        "id": "test-002",
-        "title": "Test Prompt with Variables",
-        "category": "coding",
-        "goal": "Test goal",
-        "prompt": "Explain {concept} in {language}",
-        "variables": ["concept", "language"],
-        "tags": ["test", "example"],
-        "models_tested": ["gpt-4"],
-        "responses": {
-            "gpt-4": "Test response"
-        },
-        "score": {
-            "clarity": 5,
-            "accuracy": 4,
-            "creativity": 3
-        },
-        "last_updated": "2025-10-10"
-    }
+def valid_prompt():
+    """Return a valid prompt for testing"""
+    return copy.deepcopy(_VALID_PROMPT_TEMPLATE)
 
 
 class TestPromptValidator:
     """Test suite for PromptValidator"""
     
-    def test_valid_prompt(self, validator, valid_prompt):
-        """Test validation of a valid prompt"""
-        is_valid, error, warnings = validator.validate_prompt(valid_prompt)
-        assert is_valid is True
-        assert error is None
+    @pytest.mark.parametrize("prompt", [
+        _VALID_PROMPT_TEMPLATE,
+        _VALID_PROMPT_WITH_VARIABLES_TEMPLATE,
+    ], ids=["required-fields", "all-fields"])
+    def test_valid_prompts(self, validator, prompt):
+        """Test validation of valid prompts, with and without optional fields"""
+        result = validator.validate_prompt(prompt)
+        assert result.ok
+        assert result.error is None
+    
+    def test_validate_prompts_batch(self, validator):
+        """Test batch validation returns one result per prompt, in order"""
+        results = validator.validate_prompts([
+            _VALID_PROMPT_TEMPLATE,
+            _VALID_PROMPT_WITH_VARIABLES_TEMPLATE,
+            {**_VALID_PROMPT_TEMPLATE, "category": "invalid_category"},
+        ])
+        assert [r.ok for r in results] == [True, True, False]
     
     def test_missing_required_field(self, validator):
         """Test validation fails when required field is missing"""
@@ -75,30 +97,38 @@ class TestPromptValidator:
             "category": "education",
             "prompt": "Test"
         }
-        is_valid, error, warnings = validator.validate_prompt(invalid_prompt)
-        assert is_valid is False
-        assert "responses" in error.lower() or "required" in error.lower()
+        result = validator.validate_prompt(invalid_prompt)
+        assert not result.ok
+        assert "responses" in result.error.lower() or "required" in result.error.lower()
     
-    def test_invalid_category(self, validator, valid_prompt):
-        """Test validation fails with invalid category"""
-        valid_prompt["category"] = "invalid_category"
-        is_valid, error, warnings = validator.validate_prompt(valid_prompt)
-        assert is_valid is False
-    
-    def test_invalid_id_pattern(self, validator, valid_prompt):
-        """Test validation fails with invalid ID pattern"""
-        valid_prompt["id"] = "TEST_001"  # Uppercase and underscore not allowed
-        is_valid, error, warnings = validator.validate_prompt(valid_prompt)
-        assert is_valid is False
-    
-    def test_score_out_of_range(self, validator, valid_prompt):
-        """Test validation fails when score is out of range"""
-        valid_prompt["score"] = {
-            "clarity": 10,  # Max is 5
-            "accuracy": 3
-        }
-        is_valid, error, warnings = validator.validate_prompt(valid_prompt)
-        assert is_valid is False
+    @pytest.mark.parametrize("field,value", [
+        ("category", "invalid_category"),
+        *(("id", bad_id) for bad_id in _INVALID_IDS),
+        ("score", {"clarity": 10, "accuracy": 3}),  # Max is 5
+    ])
+    def test_invalid_field(self, validator, field, value):
+        """Test validation fails when a single field breaks the schema"""
+        prompt = {**_VALID_PROMPT_TEMPLATE, field: value}
+        assert not validator.validate_prompt(prompt).ok
+    
+    def test_invalid_category_error(self, validator):
+        """Test the category fast path reports the schema's own enum"""
+        result = validator.validate_prompt({**_VALID_PROMPT_TEMPLATE, "category": "cooking"})
+        assert not result.ok
+        for category in _SCHEMA_CACHE["properties"]["category"]["enum"]:
+            assert category in result.error
+    
+    @pytest.mark.parametrize("bad_id", _INVALID_IDS)
+    def test_invalid_id_pattern(self, bad_id):
+        """Test the invalid IDs above really break the ID pattern"""
+        # Only lowercase letters, digits and hyphens are allowed
+        assert _ID_RE.match(bad_id) is None
+    
+    def test_id_trailing_newline_rejected(self, validator):
+        """Test an ID with a trailing newline fails, since the pattern's $ ends the whole string"""
+        result = validator.validate_prompt({**_VALID_PROMPT_TEMPLATE, "id": "abc-001\n"})
+        assert not result.ok
+        assert "id" in result.error
     
     def test_variable_mismatch_warning(self, validator):
         """Test warning when variable not found in prompt"""
@@ -110,10 +140,36 @@ class TestPromptValidator:
             "variables": ["concept"],  # Variable defined but not in prompt
             "responses": {"gpt-4": "response"}
         }
-        is_valid, error, warnings = validator.validate_prompt(prompt)
-        assert is_valid is True
-        assert len(warnings) > 0
-        assert "concept" in warnings[0]
+        result = validator.validate_prompt(prompt)
+        assert result.ok
+        assert {(WARN_VAR_UNUSED, "concept")} <= {(w.code, w.name) for w in result.warnings}
+    
+    def test_repeated_variable_warned_once(self, validator):
+        """Test a missing variable listed twice only produces one warning"""
+        prompt = {
+            "id": "test-006",
+            "title": "Repeated Variable",
+            "category": "education",
+            "prompt": "Explain {topic}",
+            "variables": ["topic", "level", "level"],
+            "responses": {"gpt-4": "response"}
+        }
+        result = validator.validate_prompt(prompt)
+        assert result.ok
+        assert result.warnings == (PromptWarning(WARN_VAR_UNUSED, name="level"),)
+        assert str(result.warnings[0]) == "Variable 'level' not found in prompt text"
+    
+    @pytest.mark.parametrize("text,variables,unused", [
+        ("Fill in {}", ["", "topic"], ["topic"]),
+        ("No placeholders", [""], [""]),
+        ("Explain {a{b}} and {c}d}", ["a{b}", "c}d", "e{"], ["e{"]),
+    ], ids=["empty-name", "empty-name-missing", "brace-names"])
+    def test_unusual_variable_names(self, validator, text, variables, unused):
+        """Test empty and brace-containing names are matched like a literal {name} check"""
+        prompt = {**_VALID_PROMPT_TEMPLATE, "prompt": text, "variables": variables}
+        result = validator.validate_prompt(prompt)
+        assert result.ok
+        assert [w.name for w in result.warnings if w.code == WARN_VAR_UNUSED] == unused
     
     def test_model_response_mismatch_warning(self, validator):
         """Test warning when models_tested doesn't match responses"""
@@ -125,15 +181,9 @@ class TestPromptValidator:
             "models_tested": ["gpt-4", "claude-3"],
             "responses": {"gpt-4": "response"}  # Missing claude-3
         }
-        is_valid, error, warnings = validator.validate_prompt(prompt)
-        assert is_valid is True
-        assert len(warnings) > 0
-    
-    def test_valid_prompt_with_all_fields(self, validator, valid_prompt_with_variables):
-        """Test validation of prompt with all optional fields"""
-        is_valid, error, warnings = validator.validate_prompt(valid_prompt_with_variables)
-        assert is_valid is True
-        assert error is None
+        result = validator.validate_prompt(prompt)
+        assert result.ok
+        assert WARN_MODELS_MISMATCH in {w.code for w in result.warnings}
 
 
 class TestFileValidation:
@@ -141,33 +191,131 @@ class TestFileValidation:
     
     def test_validate_nonexistent_file(self, validator):
         """Test validation of non-existent file"""
-        is_valid, error, warnings = validator.validate_prompt_file("nonexistent.json")
-        assert is_valid is False
-        assert "not found" in error.lower()
-    
-    def test_validate_invalid_json(self, validator, tmp_path):
-        """Test validation of invalid JSON file"""
-        invalid_file = tmp_path / "invalid.json"
-        invalid_file.write_text("{ invalid json }")
+        result = validator.validate_prompt_file("nonexistent.json")
+        assert not result.ok
+        assert "not found" in result.error.lower()
+    
+    def test_validate_invalid_json(self, validator):
+        """Test validation of invalid JSON content"""
+        result = validator._validate_from_json_bytes(b"{ invalid json }")
+        assert not result.ok
+        assert "json" in result.error.lower()
+    
+    def test_validate_invalid_json_file(self, validator, monkeypatch):
+        """Test a prompt file with invalid JSON, without touching the disk"""
+        monkeypatch.setattr(Path, "read_bytes", lambda self: b"{ invalid json }")
+        result = validator.validate_prompt_file("fake.json")
+        assert not result.ok
+        assert "json" in result.error.lower()
+    
+    def test_validate_directory_parallel(self, validator, valid_prompt, tmp_path):
+        """Test large directories are validated in a worker pool"""
+        count = PARALLEL_MIN_FILES + 1
+        for i in range(count):
+            (tmp_path / f"prompt_{i:03}.json").write_text(json.dumps(valid_prompt))
+        (tmp_path / "broken.json").write_text("{ invalid json }")
+        
+        results = validator.validate_directory(str(tmp_path))
+        assert len(results) == count + 1
+        assert not results[str(tmp_path / "broken.json")].ok
+        assert sum(1 for r in results.values() if r.ok) == count
+    
+    def test_iter_validated(self, validator, valid_prompt, tmp_path):
+        """Test directory iteration yields parsed data alongside results"""
+        (tmp_path / "prompt.json").write_text(json.dumps(valid_prompt))
+        (tmp_path / "broken.json").write_text("{ invalid json }")
+        
+        scanned = {Path(path).name: (data, is_valid)
+                   for path, data, is_valid, _, _ in validator.iter_validated(str(tmp_path))}
+        assert scanned["prompt.json"] == (valid_prompt, True)
+        assert scanned["broken.json"] == (None, False)
+    
+    def test_validate_directory_cache(self, validator, valid_prompt, tmp_path):
+        """Test cached directory results are reused until a file changes"""
+        prompt_file = tmp_path / "prompt.json"
+        prompt_file.write_text(json.dumps(valid_prompt))
+        
+        cache_file = tmp_path / CACHE_FILENAME
+        
+        first = validator.validate_directory(str(tmp_path), cache_path=str(cache_file))
+        assert cache_file.exists()
+        assert validator.validate_directory(str(tmp_path), cache_path=str(cache_file)) == first
+        
+        valid_prompt["category"] = "invalid_category"
+        prompt_file.write_text(json.dumps(valid_prompt, indent=2))
+        results = validator.validate_directory(str(tmp_path), cache_path=str(cache_file))
+        assert not results[str(prompt_file)].ok
+    
+    def test_validate_directory_cache_opt_in(self, validator, valid_prompt, tmp_path):
+        """Test no cache file is written unless one is asked for, and it gets normal permissions"""
+        (tmp_path / "prompt.json").write_text(json.dumps(valid_prompt))
+        validator.validate_directory(str(tmp_path))
+        assert not (tmp_path / CACHE_FILENAME).exists()
+        
+        cache_file = tmp_path / CACHE_FILENAME
+        validator.validate_directory(str(tmp_path), cache_path=str(cache_file))
+        umask = os.umask(0)
+        os.umask(umask)
+        assert cache_file.stat().st_mode & 0o777 == 0o666 & ~umask
+    
+    def test_validate_directory_cache_tracks_rules(self, valid_prompt, tmp_path, monkeypatch):
+        """Test a change to the validation rules invalidates cached results"""
+        (tmp_path / "prompt.json").write_text(json.dumps(valid_prompt))
+        cache_file = str(tmp_path / CACHE_FILENAME)
+        validator = PromptValidator()
+        validator.validate_directory(str(tmp_path), cache_path=cache_file)
         
-        is_valid, error, warnings = validator.validate_prompt_file(str(invalid_file))
-        assert is_valid is False
-        assert "json" in error.lower()
+        validated = []
+        validate_file = validator.validate_prompt_file
+        
+        def spy(path):
+            validated.append(path)
+            return validate_file(path)
+        
+        monkeypatch.setattr(validator, "validate_prompt_file", spy)
+        validator.validate_directory(str(tmp_path), cache_path=cache_file)
+        assert validated == []
+        
+        monkeypatch.setattr(prompt_validator, "_RULES_FINGERPRINT", "changed")
+        validator.validate_directory(str(tmp_path), cache_path=cache_file)
+        assert validated == [str(tmp_path / "prompt.json")]
+    
+    def test_validate_directory_corrupt_cache(self, validator, valid_prompt, tmp_path):
+        """Test malformed cache entries are treated as misses"""
+        (tmp_path / "a.json").write_text(json.dumps(valid_prompt))
+        (tmp_path / "b.json").write_text(json.dumps(valid_prompt))
+        (tmp_path / "c.json").write_text(json.dumps(valid_prompt))
+        cache_file = tmp_path / CACHE_FILENAME
+        cache_file.write_text(json.dumps({
+            "root": str(tmp_path.resolve()),
+            "files": {
+                "a.json": "not an entry",
+                "b.json": {"result": [True, None, []]},
+                "c.json": {"key": None, "result": 42},
+            }
+        }))
+        
+        results = validator.validate_directory(str(tmp_path), cache_path=str(cache_file))
+        assert len(results) == 3
+        assert all(r.ok for r in results.values())
+
+
+def test_schema_loaded_once_per_process():
+    """Test validators on the same schema file share the parsed schema"""
+    assert PromptValidator().schema is PromptValidator(str(_SCHEMA_PATH)).schema
+
+
+def test_id_pattern_matches_schema():
+    """Test the local ID regex stays in sync with the schema"""
+    assert _ID_RE.pattern == _SCHEMA_CACHE["properties"]["id"]["pattern"]
 
 
 def test_schema_file_exists():
     """Test that the schema file exists"""
-    schema_path = Path(__file__).parent.parent / "core" / "prompt_schema.json"
-    assert schema_path.exists()
+    assert _SCHEMA_PATH.exists()
     
     # Verify it's valid JSON
-    with open(schema_path) as f:
-        schema = json.load(f)
-    
-    assert "$schema" in schema
-    assert "properties" in schema
-    assert "required" in schema
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
+    assert _SCHEMA_CACHE is not None
+    assert "$schema" in _SCHEMA_CACHE
+    assert "properties" in _SCHEMA_CACHE
+    assert "required" in _SCHEMA_CACHE